@@ -10,14 +10,15 @@ __author__ = "LeetCode Agent Developer"
 __email__ = "developer@example.com"
 
 # Import main components for easy access
-from .core import LeetCodeAgent
-from .browser import PlaywrightManager, init_playwright, cleanup_playwright
+from .core import LeetCodeAgent, solve_problems
+from .browser import playwright_session, init_playwright, cleanup_playwright
 from .utils import setup_logging, get_config, validate_url
 from .main import main
 
 __all__ = [
     "LeetCodeAgent",
-    "PlaywrightManager",
+    "solve_problems",
+    "playwright_session",
     "init_playwright",
     "cleanup_playwright",
     "setup_logging",
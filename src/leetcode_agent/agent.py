@@ -8,20 +8,37 @@ Setup for an AI agent that:
 - Provides conversation export and summary functionalities
 """
 
+import asyncio
+import fnmatch
+import io
 import os
 import json
+import time
+from collections import Counter
 from datetime import datetime
+from pathlib import Path
 from typing import Dict
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.schema import HumanMessage, SystemMessage
+from langchain.memory import ConversationSummaryBufferMemory
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
 from langchain_core.chat_history import InMemoryChatMessageHistory
 from leetcode_agent.utils import setup_logging
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+# orjson encodes dict-heavy payloads several times faster than stdlib json;
+# fall back to json when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
+# Module-level logger shared by all agent instances
+logger = setup_logging("INFO")
+
 
 # Define tools as Pydantic models for LangChain
 class CreateFile(BaseModel):
@@ -49,9 +66,17 @@ class ListFiles(BaseModel):
     pattern: str = Field(default="*", description="Glob pattern to match files")
 
 
+# Tool schemas are static, so the bound LLM Runnable can be shared between
+# agents with the same model settings instead of re-validating per instance
+_TOOLS = [CreateFile, ReadFile, ListFiles]
+_BOUND_LLM_CACHE = {}
+
+
 class ConversationTemplate:
     """Template for structuring conversations."""
 
+    __slots__ = ("system_prompt",)
+
     def __init__(self, system_prompt: str = None):
         self.system_prompt = system_prompt or self.default_system_prompt()
 
@@ -65,13 +90,10 @@ class ConversationTemplate:
                 - If there is any wrong case provided , please fix the code and return the fixed code only.
               """
 
-    def format_message(self, role: str, content: str) -> Dict[str, str]:
-        """Format a message with role and content."""
-        return {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-        }
+
+# Shared default template: the default system prompt is immutable, so one
+# instance can serve every agent instead of being rebuilt per construction
+_DEFAULT_TEMPLATE = ConversationTemplate()
 
 
 class AiAgent:
@@ -83,6 +105,7 @@ class AiAgent:
         model_name: str = "gemini-pro",
         template: ConversationTemplate = None,
         temperature: float = 0.7,
+        summary_memory: bool = True,
     ):
         """
         Initialize the Gemini Agent using LangChain.
@@ -92,6 +115,9 @@ class AiAgent:
             model_name: Gemini model name
             template: Conversation template
             temperature: Model temperature (0.0-1.0)
+            summary_memory: Use summary+buffer memory for the prompt.
+                When False, fall back to a sliding window over the last
+                few turns instead (no extra summarization LLM calls).
         """
         # Set up API key
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
@@ -100,36 +126,52 @@ class AiAgent:
                 "Google API key is required. Set GOOGLE_API_KEY environment variable or pass api_key parameter."
             )
 
-        # Initialize LangChain's ChatGoogleGenerativeAI
+        # Initialize LangChain's ChatGoogleGenerativeAI, reusing a cached
+        # tool-bound Runnable when the same configuration was seen before
         self.model_name = model_name
-        self.base_llm = ChatGoogleGenerativeAI(
-            model=model_name,
-            google_api_key=self.api_key,
-            temperature=temperature,
-            convert_system_message_to_human=True,  # Gemini doesn't support system messages
-        )
+        cache_key = (model_name, temperature, hash(self.api_key))
+        cached = _BOUND_LLM_CACHE.get(cache_key)
+        if cached is None:
+            base_llm = ChatGoogleGenerativeAI(
+                model=model_name,
+                google_api_key=self.api_key,
+                temperature=temperature,
+                convert_system_message_to_human=True,  # Gemini doesn't support system messages
+            )
+            cached = (base_llm, base_llm.bind_tools(_TOOLS))
+            _BOUND_LLM_CACHE[cache_key] = cached
+        self.base_llm, self.llm = cached
+
+        self.tools = _TOOLS
 
-        # Bind tools to the LLM
-        self.tools = [CreateFile, ReadFile, ListFiles]
-        self.llm = self.base_llm.bind_tools(self.tools)
+        # Dispatch table for tool execution: one dict lookup per call
+        self._tool_dispatch = {
+            "CreateFile": self.create_file,
+            "ReadFile": self.read_file,
+            "ListFiles": self.list_files,
+        }
 
         # Set up template and conversation
-        self.template = template or ConversationTemplate()
+        self.template = template or _DEFAULT_TEMPLATE
 
-        # Initialize LangChain memory (using new approach)
+        # Full transcript of the session (also backs the sliding window)
         self.chat_history = InMemoryChatMessageHistory()
 
-        # Add system message to memory
-        self.chat_history.add_message(
-            SystemMessage(content=self.template.system_prompt)
-        )
-
-        # Keep conversation history for export functionality
-        self.conversation_history = [
-            self.template.format_message("system", self.template.system_prompt)
-        ]
+        # Number of recent turns the sliding-window fallback keeps
+        self.window_k = 6
+
+        # Summary+buffer memory keeps the prompt bounded: old turns get folded
+        # into a running summary instead of being re-sent verbatim every call
+        self.memory = None
+        if summary_memory:
+            self.memory = ConversationSummaryBufferMemory(
+                llm=self.base_llm,
+                max_token_limit=2000,
+                return_messages=True,
+                memory_key="chat_history",
+            )
 
-        self.logger = setup_logging("INFO")
+        self.logger = logger
 
         self.used_tokens = 0
 
@@ -139,43 +181,55 @@ class AiAgent:
         tool_args = tool_call["args"]
 
         try:
-            if tool_name == "CreateFile":
-                return self.create_file(**tool_args)
-            elif tool_name == "ReadFile":
-                return self.read_file(**tool_args)
-            elif tool_name == "ListFiles":
-                return self.list_files(**tool_args)
-            else:
+            handler = self._tool_dispatch.get(tool_name)
+            if handler is None:
                 return f"❌ Unknown tool: {tool_name}"
+            return handler(**tool_args)
         except Exception as e:
             return f"❌ Error executing {tool_name}: {str(e)}"
 
     def add_message(self, role: str, content: str):
-        """Add a message to conversation history and LangChain memory."""
-        # Add to our custom history for export functionality
-        message = self.template.format_message(role, content)
-        self.conversation_history.append(message)
-
-        # Add to LangChain memory
-        if role == "user":
-            self.chat_history.add_user_message(content)
-        elif role == "assistant":
-            self.chat_history.add_ai_message(content)
-
-    def chat(self, user_message: str) -> str:
-        """Send a message to the agent and get a response using LangChain."""
+        """Add a timestamped message to the session transcript."""
+        message_cls = HumanMessage if role == "user" else AIMessage
+        self.chat_history.add_message(
+            # time.time_ns() is a cheap integer; formatting happens at export
+            message_cls(
+                content=content,
+                additional_kwargs={"timestamp": time.time_ns()},
+            )
+        )
+
+    async def chat(self, user_message: str, on_token=None) -> str:
+        """
+        Send a message to the agent and get a response using LangChain.
+
+        Args:
+            user_message: The message to send.
+            on_token: Optional callback invoked with each streamed text
+                chunk as it arrives, for incremental display/processing.
+        """
         try:
-            # Get conversation history as LangChain messages
-            messages = list(self.chat_history.messages)
+            # Load the bounded memory (summary + recent turns) as messages,
+            # or fall back to a sliding window over the last K turns
+            messages = [SystemMessage(content=self.template.system_prompt)]
+            if self.memory is not None:
+                messages += self.memory.load_memory_variables({})["chat_history"]
+            else:
+                messages += list(self.chat_history.messages)[-2 * self.window_k :]
 
             # Add current user message
             messages.append(HumanMessage(content=user_message))
 
-            # Generate response using LangChain with tools
-            response = self.llm.invoke(messages)
+            # Stream the response so tokens can be processed as they arrive
+            # instead of blocking until the full completion is generated
+            response = None
+            async for chunk in self.llm.astream(messages):
+                if on_token and chunk.content:
+                    on_token(chunk.content)
+                response = chunk if response is None else response + chunk
 
             assistant_message = response.content
-            token_usage = response.usage_metadata.get("total_tokens", 0)
+            token_usage = (response.usage_metadata or {}).get("total_tokens", 0)
 
             self.logger.info(f"📈 Token used: {token_usage}")
 
@@ -188,20 +242,28 @@ class AiAgent:
                 self.logger.info(
                     f"🔧 Agent wants to use {len(response.tool_calls)} tools:"
                 )
-                tool_results = []
-
                 for tool_call in response.tool_calls:
                     self.logger.info(f"🪚 Agent use - {tool_call['name']}")
-                    result = self.execute_tool_call(tool_call)
-                    tool_results.append(result)
 
-                if tool_results:
-                    for result in tool_results:
-                        self.logger.info(f"💡 Tool report: {result}")
+                # Tool calls are I/O-bound, so run them concurrently in the
+                # default thread pool instead of one after another
+                tool_results = await asyncio.gather(
+                    *(
+                        asyncio.to_thread(self.execute_tool_call, tool_call)
+                        for tool_call in response.tool_calls
+                    )
+                )
+
+                for result in tool_results:
+                    self.logger.info(f"💡 Tool report: {result}")
 
-            # Add both messages to history
+            # Save the completed turn to the transcript and memory
             self.add_message("user", user_message)
             self.add_message("assistant", assistant_message)
+            if self.memory is not None:
+                self.memory.save_context(
+                    {"input": user_message}, {"output": assistant_message}
+                )
 
             return response_text
 
@@ -212,50 +274,52 @@ class AiAgent:
 
     def clear_conversation(self):
         """Clear conversation history and LangChain memory."""
-        # Clear LangChain memory
+        # Clear LangChain memory (transcript, summary and buffered turns)
         self.chat_history.clear()
-
-        # Re-add system message to memory
-        self.chat_history.add_message(
-            SystemMessage(content=self.template.system_prompt)
-        )
-
-        # Clear our custom history
-        self.conversation_history = [
-            self.template.format_message("system", self.template.system_prompt)
-        ]
+        if self.memory is not None:
+            self.memory.clear()
         self.logger.info("🧹 Conversation history cleared")
 
+    @staticmethod
+    def _isoformat_ts(ts_ns):
+        """Render a nanosecond timestamp as an ISO string (lazily, on export)."""
+        if ts_ns:
+            return datetime.fromtimestamp(ts_ns / 1e9).isoformat()
+        return None
+
+    @staticmethod
+    def _message_role(msg) -> str:
+        """Map a LangChain message object to its conversation role."""
+        if isinstance(msg, HumanMessage):
+            return "user"
+        if isinstance(msg, AIMessage):
+            return "assistant"
+        return "system"
+
     def get_conversation_summary(self) -> Dict:
         """Get a summary of the conversation."""
-        user_messages = [
-            msg for msg in self.conversation_history if msg["role"] == "user"
-        ]
-        assistant_messages = [
-            msg for msg in self.conversation_history if msg["role"] == "assistant"
-        ]
+        messages = list(self.chat_history.messages)
+
+        # Count all roles in a single pass, no intermediate lists
+        role_counts = Counter(self._message_role(m) for m in messages)
 
         # Helper function to format timestamp
-        def format_timestamp(iso_timestamp):
-            if iso_timestamp:
-                dt = datetime.fromisoformat(iso_timestamp)
+        def format_timestamp(ts_ns):
+            if ts_ns:
+                dt = datetime.fromtimestamp(ts_ns / 1e9)
                 return dt.strftime("%Y-%m-%d %H:%M:%S")
             return None
 
         return {
-            "📮 total_messages": len(self.conversation_history),
-            "📤 user_messages": len(user_messages),
-            "📥 assistant_messages": len(assistant_messages),
+            "📮 total_messages": len(messages),
+            "📤 user_messages": role_counts["user"],
+            "📥 assistant_messages": role_counts["assistant"],
             "💰 total_tokens_used": self.used_tokens,
             "🕒 first_message_time": format_timestamp(
-                self.conversation_history[1]["timestamp"]
-                if len(self.conversation_history) > 1
-                else None
+                messages[0].additional_kwargs.get("timestamp") if messages else None
             ),
             "🕒 last_message_time": format_timestamp(
-                self.conversation_history[-1]["timestamp"]
-                if self.conversation_history
-                else None
+                messages[-1].additional_kwargs.get("timestamp") if messages else None
             ),
             "🧠 model": self.model_name,
         }
@@ -263,17 +327,32 @@ class AiAgent:
     def export_conversation(self, format_type: str = "text") -> str:
         """Export conversation in different formats."""
         if format_type == "text":
-            lines = []
-            for msg in self.conversation_history:
-                if msg["role"] != "system":
-                    role = msg["role"].upper()
-                    content = msg["content"]
-                    timestamp = msg["timestamp"]
-                    lines.append(f"[{timestamp}] {role}: {content}\n")
-            return "\n".join(lines)
+            # One contiguous growing buffer instead of a list of lines
+            # (the old append-with-\n plus "\n".join doubled the newlines)
+            buf = io.StringIO()
+            for msg in self.chat_history.messages:
+                role = self._message_role(msg)
+                if role != "system":
+                    timestamp = self._isoformat_ts(
+                        msg.additional_kwargs.get("timestamp")
+                    )
+                    buf.write(f"[{timestamp}] {role.upper()}: {msg.content}\n")
+            return buf.getvalue()
 
         elif format_type == "json":
-            return json.dumps(self.conversation_history, indent=2, ensure_ascii=False)
+            history = [
+                {
+                    "role": self._message_role(msg),
+                    "content": msg.content,
+                    "timestamp": self._isoformat_ts(
+                        msg.additional_kwargs.get("timestamp")
+                    ),
+                }
+                for msg in self.chat_history.messages
+            ]
+            if orjson is not None:
+                return orjson.dumps(history, option=orjson.OPT_INDENT_2).decode()
+            return json.dumps(history, indent=2, ensure_ascii=False)
 
         else:
             return "Unsupported format. Use 'text' or 'json'."
@@ -293,21 +372,21 @@ class AiAgent:
             Success/error message
         """
         try:
-            # Check if file exists and overwrite is False
-            if os.path.exists(file_path) and not overwrite:
-                return f"❌ File already exists: {file_path}. Use overwrite=True to replace it."
-
-            # Create directory if it doesn't exist
-            directory = os.path.dirname(file_path)
-            if directory and not os.path.exists(directory):
-                os.makedirs(directory, exist_ok=True)
-                self.logger.info(f"📁 Created directory: {directory}")
-
-            action = "Created" if not os.path.exists(file_path) else "Overwritten"
-
-            # Create and write file
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(content)
+            # exist_ok=True makes the pre-existence check unnecessary
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+
+            # Exclusive create: the kernel does the existence check
+            # atomically, so no stat syscalls are needed up front
+            try:
+                with open(file_path, "x", encoding="utf-8") as f:
+                    f.write(content)
+                action = "Created"
+            except FileExistsError:
+                if not overwrite:
+                    return f"❌ File already exists: {file_path}. Use overwrite=True to replace it."
+                with open(file_path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                action = "Overwritten"
 
             return f"✅ {action} file: {file_path} ({len(content)} characters)"
 
@@ -325,14 +404,13 @@ class AiAgent:
             File content or error message
         """
         try:
-            if not os.path.exists(file_path):
-                return f"❌ File not found: {file_path}"
-
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
+            # Single whole-file read; a missing file surfaces as the
+            # exception rather than a separate stat check
+            content = Path(file_path).read_text(encoding="utf-8")
             return f"📄 File content ({len(content)} characters):\n{content}"
 
+        except FileNotFoundError:
+            return f"❌ File not found: {file_path}"
         except Exception as e:
             return f"❌ Error reading file {file_path}: {str(e)}"
 
@@ -348,26 +426,25 @@ class AiAgent:
             List of files or error message
         """
         try:
-            import glob
-
-            if not os.path.exists(directory):
-                return f"❌ Directory not found: {directory}"
-
-            search_pattern = os.path.join(directory, pattern)
-            files = glob.glob(search_pattern)
-
-            if not files:
-                return f"📂 No files found matching '{pattern}' in {directory}"
-
+            # Single scandir pass: DirEntry caches stat info, so no extra
+            # per-file syscalls for type and size checks
             file_list = []
-            for file in sorted(files):
-                if os.path.isfile(file):
-                    size = os.path.getsize(file)
-                    file_list.append(f"  📄 {os.path.basename(file)} ({size} bytes)")
-                elif os.path.isdir(file):
-                    file_list.append(f"  📁 {os.path.basename(file)}/")
+            with os.scandir(directory) as entries:
+                for entry in sorted(entries, key=lambda e: e.name):
+                    if not fnmatch.fnmatch(entry.name, pattern):
+                        continue
+                    if entry.is_file():
+                        size = entry.stat().st_size
+                        file_list.append(f"  📄 {entry.name} ({size} bytes)")
+                    elif entry.is_dir():
+                        file_list.append(f"  📁 {entry.name}/")
+
+            if not file_list:
+                return f"📂 No files found matching '{pattern}' in {directory}"
 
             return f"📂 Files in {directory}:\n" + "\n".join(file_list)
 
+        except FileNotFoundError:
+            return f"❌ Directory not found: {directory}"
         except Exception as e:
             return f"❌ Error listing files in {directory}: {str(e)}"
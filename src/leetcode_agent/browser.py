@@ -4,13 +4,40 @@ This module provides web automation capabilities using Playwright async API,
 with proper resource management and error handling.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+
 from leetcode_agent.utils import setup_logging
 import os
+import time
 from dotenv import load_dotenv
 from playwright.async_api import async_playwright, Playwright, BrowserContext, Page
 
 load_dotenv()
 
+# Module-level logger shared by all browser sessions
+logger = setup_logging("INFO")
+
+# Shared browser state reused across init_playwright calls: launching a
+# browser costs seconds, so keep one alive and hand out fresh contexts.
+# The lock serializes the lazy launch so concurrent workers cannot both
+# see an empty slot and launch twice
+_SHARED = {"playwright": None, "browser": None, "refcount": 0}
+_LAUNCH_LOCK = asyncio.Lock()
+
+# Auth/session state (cookies + localStorage) persisted between runs
+STATE_PATH = Path.home() / ".leetcode_agent" / "storage_state.json"
+
+
+async def has_valid_session(context) -> bool:
+    """Return True when the context holds an unexpired LEETCODE_SESSION cookie."""
+    cookies = await context.cookies("https://leetcode.com")
+    return any(
+        c["name"] == "LEETCODE_SESSION" and c.get("expires", 0) > time.time()
+        for c in cookies
+    )
+
 
 async def init_playwright(
     headless,
@@ -32,20 +59,56 @@ async def init_playwright(
     if headless is None:
         headless = os.getenv("HEADLESS_BROWSER", "True").lower() == "true"
 
-    playwright = await async_playwright().start()
-    context = await playwright.chromium.launch_persistent_context(
-        "",
-        headless=headless,
-        channel="chrome",  # This uses real Chrome instead of Chromium
-        args=[
-            "--disable-blink-features=AutomationControlled",  # Stealth
-        ],
+    # Launch the browser only once; later calls reuse the shared instance.
+    # Re-check under the lock: a concurrent caller may have launched while
+    # this one was waiting
+    async with _LAUNCH_LOCK:
+        if _SHARED["playwright"] is None:
+            args = [
+                "--disable-blink-features=AutomationControlled",  # Stealth
+            ]
+            if headless:
+                # No GUI to render and no sandboxing needs in scrape mode
+                args += ["--disable-dev-shm-usage", "--disable-gpu", "--no-sandbox"]
+
+            playwright = await async_playwright().start()
+            browser = await playwright.chromium.launch(
+                headless=headless,
+                channel="chrome",  # This uses real Chrome instead of Chromium
+                args=args,
+            )
+            _SHARED["playwright"] = playwright
+            _SHARED["browser"] = browser
+
+        playwright = _SHARED["playwright"]
+        browser = _SHARED["browser"]
+        _SHARED["refcount"] += 1
+
+    # Restore cookies + localStorage from the saved storage state, if any
+    context = await browser.new_context(
+        storage_state=STATE_PATH if STATE_PATH.exists() else None,
         viewport={"width": 1280, "height": 900},
     )
-
-    pages = context.pages
-    page = pages[0] if pages else await context.new_page()
-    await page.goto("https://leetcode.com/accounts/login", wait_until="load")
+    page = await context.new_page()
+
+    if headless:
+        # Images and fonts are pure bandwidth for headless scraping;
+        # abort them before the first navigation
+        await page.route(
+            "**/*.{png,jpg,jpeg,gif,webp,svg,woff,woff2,ttf}",
+            lambda route: route.abort(),
+        )
+
+    # Skip the login page when the profile already has a valid session
+    # cookie; "domcontentloaded" fires long before images/fonts finish
+    if await has_valid_session(context):
+        await page.goto(
+            "https://leetcode.com/problemset/", wait_until="domcontentloaded"
+        )
+    else:
+        await page.goto(
+            "https://leetcode.com/accounts/login", wait_until="domcontentloaded"
+        )
 
     return playwright, context, page
 
@@ -60,45 +123,53 @@ async def cleanup_playwright(playwright, context=None, page=None):
         page: Page instance (optional)
     """
     try:
+        # Persist the session (cookies + localStorage) for the next run
+        if context:
+            STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            await context.storage_state(path=STATE_PATH)
+
         if page:
             await page.close()
         if context:
             await context.close()
-        if playwright:
-            await playwright.stop()
+
+        # Only tear down the shared browser when the last session is done
+        if _SHARED["refcount"] > 0:
+            _SHARED["refcount"] -= 1
+        if _SHARED["refcount"] == 0:
+            browser = _SHARED["browser"]
+            _SHARED["playwright"] = None
+            _SHARED["browser"] = None
+            if browser:
+                await browser.close()
+            if playwright:
+                await playwright.stop()
     except Exception as e:
         print(f"Error during cleanup: {e}")
 
 
-class PlaywrightManager:
+@asynccontextmanager
+async def playwright_session(headless):
     """
     Async context manager for Playwright that handles cleanup automatically.
 
     Usage:
-        async with AsyncPlaywrightManager(headless) as (playwright, context, page):
+        async with playwright_session(headless) as (playwright, context, page):
             # Use page here - this is where you do your actual work
             await page.click("button")
             title = await page.title()
             await page.screenshot(path="screenshot.png")
         # Everything is automatically cleaned up here
     """
-
-    def __init__(self, headless):
-        self.headless = headless
-        self.resources = None  # Will store (playwright, context, page)
-        self.logger = setup_logging("INFO")
-
-    async def __aenter__(self):
-        self.resources = await init_playwright(self.headless)
-        return self.resources
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.resources:
-            self.logger.info("🧹 Cleaning up browser resources...")
-            await cleanup_playwright(*self.resources)
-            self.logger.info("✅ Cleanup completed")
-        if exc_type is not None:
-            self.logger.error(
-                f"⚠️  Exception occurred during execution: {exc_type.__name__}: {exc_val}"
-            )
-        return False
+    resources = await init_playwright(headless)
+    try:
+        yield resources
+    except Exception as e:
+        logger.error(
+            f"⚠️  Exception occurred during execution: {type(e).__name__}: {e}"
+        )
+        raise
+    finally:
+        logger.info("🧹 Cleaning up browser resources...")
+        await cleanup_playwright(*resources)
+        logger.info("✅ Cleanup completed")
@@ -5,20 +5,99 @@ This module contains the main LeetCodeAgent class and problem-solving logic for
 """
 
 import asyncio
+import difflib
+import hashlib
+import json
+import re
+import sys
 from typing import Dict, Any
-from xmlrpc.client import boolean
 
-from .agent import ConversationTemplate, AiAgent
-from .browser import PlaywrightManager
+from .agent import AiAgent
+from .browser import playwright_session, has_valid_session, STATE_PATH
 from .utils import setup_logging
-import time
 import os
 import platform
 from dotenv import load_dotenv
-from playwright.sync_api._generated import Page
+from playwright.async_api import Page
 
 load_dotenv()
 
+# Platform detection and keyboard shortcuts resolved once at import,
+# plus the API key so the submit path does no env lookups
+_IS_MAC = platform.system() == "Darwin"
+_SELECT_ALL_KEY = "Meta+a" if _IS_MAC else "Control+a"
+_PASTE_KEY = "Meta+v" if _IS_MAC else "Control+v"
+_GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+# Accepted solutions keyed by problem hash, so re-running a problem the
+# agent already solved skips the LLM call (and its prompt prefill) entirely
+_SOLUTION_CACHE: Dict[str, str] = {}
+
+# On-disk snapshot of the solution cache, so the cache survives between
+# runs (lives next to the browser storage state)
+_SESSION_PATH = STATE_PATH.parent / "session.json"
+_session_loaded = False
+
+
+def _load_session() -> None:
+    """Load the persisted problem→solution cache, once per process."""
+    global _session_loaded
+    if _session_loaded:
+        return
+    _session_loaded = True
+    try:
+        data = json.loads(_SESSION_PATH.read_text(encoding="utf-8"))
+        _SOLUTION_CACHE.update(data.get("solutions", {}))
+    except (OSError, json.JSONDecodeError):
+        pass
+
+
+def _save_session() -> None:
+    """Persist the solution cache to disk."""
+    try:
+        _SESSION_PATH.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"solutions": _SOLUTION_CACHE}
+        _SESSION_PATH.write_text(
+            json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+    except OSError:
+        pass
+
+# Selectors for the problem page, parsed once at import
+_DAILY_PROBLEM_LINK = "xpath=//a[contains(@class,'group flex flex-col rounded-[8px] duration-300 bg-fill-quaternary dark:bg-fill-quaternary')]"
+_PROBLEM_PANEL = "xpath=//div[contains(@class, 'flex w-full flex-1 flex-col gap-4 overflow-y-auto px-4 py-5')]"
+_RESULT_AREA = "xpath=//*[@data-layout-path='/ts0/tb1']"
+_SUBMIT_BUTTON = "xpath=//button[@data-cid='3']"
+
+# Judge verdicts, compiled once; grab_result stores the matched verdict so
+# retries can be targeted instead of re-scanning the panel text
+_VERDICT = re.compile(
+    r"Accepted|Wrong Answer|Time Limit Exceeded|Memory Limit Exceeded"
+    r"|Runtime Error|Compile Error"
+)
+
+# Where the failing-case section of the result panel starts
+_CASE_START = re.compile(r"\bInput\b")
+
+# Verdict-specific guidance for the retry prompt
+_VERDICT_HINTS = {
+    "Time Limit Exceeded": "The solution is too slow - use a more efficient algorithm.",
+    "Memory Limit Exceeded": "The solution uses too much memory - reduce the space complexity.",
+    "Runtime Error": "The code crashes at runtime - fix the failing operation.",
+    "Compile Error": "The code does not compile - fix the syntax or types.",
+}
+_DEFAULT_HINT = "The output is incorrect - fix the logic."
+
+# Requests the agent never needs: heavy static resources and trackers.
+# Scripts and stylesheets stay enabled — the Monaco editor needs them.
+_BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+_TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+)
+
 
 class LeetCodeAgent:
     """
@@ -35,7 +114,9 @@ class LeetCodeAgent:
             headless (bool): Whether to run the browser in headless mode.
             log_level (str): Logging level (DEBUG, INFO, WARNING, ERROR).
             lang (str): Programming language for solving problems.
-            browser_manager: Optional browser manager instance.
+            browser_manager: Optional (playwright, context, page) tuple from
+                init_playwright. When given, the agent reuses the session
+                and leaves its teardown to the caller.
         """
         self.headless = headless
         self.logger = setup_logging(log_level)
@@ -46,13 +127,24 @@ class LeetCodeAgent:
         self.current_problem_text = None  # Current problem statement text
         self.current_editor_text = None  # Current code in the editor
         self.wrong_case = []  # List of wrong test cases
+        self.last_verdict = None  # Judge verdict payload from the last submit
+        self.failure_verdict = None  # Verdict string of the last failed attempt
+
+        # Locators cached per page so XPath parsing happens only once
+        self._editor = None
+        self._problem = None
+        self._result = None
+        self._submit = None
 
         # Detect OS for cross-platform keyboard shortcuts
-        self.is_mac = platform.system() == "Darwin"
+        self.is_mac = _IS_MAC
 
         # AI agent model (to be initialized later)
         self.ai_agent = None
 
+        # Restore solutions cached by previous runs
+        _load_session()
+
     async def start_automation(self, url) -> None:
         """
         Initialize the browser and AI agent, and start the automation process.
@@ -61,26 +153,77 @@ class LeetCodeAgent:
             url (str): URL to navigate to.
         """
         self.logger.info(f"🚀 Starting LeetCode Agent...")
-        self.browser_manager = PlaywrightManager(headless=self.headless)
-        self.ai_agent = AiAgent(
-            model_name="gemini-2.5-flash",
-            temperature=0.5,
-            api_key=os.getenv("GOOGLE_API_KEY"),
-            template=ConversationTemplate(),
-        )  # Initialize your AI agent here
-
-        async with self.browser_manager as (playwright, context, page):
-            input("Please complete login, then press Enter to continue...")
+        # Reuse an externally-provided (playwright, context, page) tuple when
+        # one was injected, so a single session (and its auth state) spans
+        # multiple solves; otherwise open a session this run owns
+        session_cm = None
+        browser_task = None
+        if self.browser_manager is None:
+            session_cm = playwright_session(headless=self.headless)
+            # Launch the browser and build the AI agent concurrently: both
+            # take hundreds of ms and are completely independent
+            browser_task = asyncio.ensure_future(session_cm.__aenter__())
+
+        try:
+            self.ai_agent = await asyncio.to_thread(
+                AiAgent,
+                model_name="gemini-2.5-flash",
+                temperature=0.5,
+                api_key=_GOOGLE_API_KEY,
+            )
+        except BaseException:
+            # Don't leak the in-flight launch when agent construction fails
+            # (e.g. missing API key): finish entering the session, tear it
+            # down, then re-raise the original error
+            if browser_task is not None:
+                try:
+                    await browser_task
+                except Exception:
+                    pass
+                else:
+                    await session_cm.__aexit__(*sys.exc_info())
+            raise
+
+        if browser_task is not None:
+            self.browser_manager = await browser_task
+        playwright, context, page = self.browser_manager
+
+        try:
+            # A valid session cookie means the context is already logged in;
+            # otherwise prompt without blocking the event loop so browser
+            # and agent warmup keep progressing during the manual login
+            if await has_valid_session(context):
+                self.logger.info("🔑 Reusing saved login session")
+            else:
+                await asyncio.to_thread(
+                    input, "Please complete login, then press Enter to continue..."
+                )
             # Add local storage values before navigation
             local_storage_items = {
                 "hasShownNewFeatureGuide": "true",  # Dismiss feature guide
                 "global_lang": self.lang,  # Set editor language
             }
 
-            # Set local storage items
-            for key, value in local_storage_items.items():
-                if value:
-                    await page.evaluate(f"localStorage.setItem('{key}', '{value}')")
+            # Seed localStorage from an init script so the values are already
+            # in place when each document loads — one registration covers the
+            # first navigation and every reload after it
+            items = {k: v for k, v in local_storage_items.items() if v}
+            await page.add_init_script(
+                f"Object.entries({json.dumps(items)}).forEach(([k, v]) => localStorage.setItem(k, v))"
+            )
+
+            # Abort images, media, fonts and tracker requests before
+            # navigating: they are pure bandwidth for the automation
+            async def block_extras(route):
+                request = route.request
+                if request.resource_type in _BLOCKED_RESOURCE_TYPES or any(
+                    domain in request.url for domain in _TRACKER_DOMAINS
+                ):
+                    await route.abort()
+                else:
+                    await route.continue_()
+
+            await page.route("**/*", block_extras)
 
             if not url:
                 self.logger.info(f"🚀 Starting browser and navigating to daily problem")
@@ -91,16 +234,32 @@ class LeetCodeAgent:
 
             await self.grabProblem(page)
             attempt = 0
+            previous_codes = []
             while attempt < 5:  # Limit to 5 attempts
                 self.logger.info(f"🧠 Attempt {attempt + 1}: Solving problem...")
 
-                result_code = self.solve_problem(attempt)
+                result_code = await self.solve_problem(attempt)
+
+                # A near-identical regeneration means the model is stuck;
+                # stop burning LLM calls and submissions on it
+                if any(
+                    difflib.SequenceMatcher(None, result_code, prev).ratio() > 0.98
+                    for prev in previous_codes
+                ):
+                    self.logger.info(
+                        "🔁 Model keeps producing the same solution - giving up early"
+                    )
+                    break
+                previous_codes.append(result_code)
+
                 await self.writeAnswer(page, result_code)
 
                 if await self.grab_result(page):
+                    _SOLUTION_CACHE[self._problem_key()] = result_code
+                    _save_session()
                     self.logger.info("🎉 Problem solved successfully!")
                     self.logger.info("📝 Writing solution to file...")
-                    self.ai_agent.chat(
+                    await self.ai_agent.chat(
                         """Great! The solution worked perfectly. Thank you! There still has some work to do
                           - please create a markdown file and name it with the problem title and difficulty like `1. Two Sum - (Easy).md` in the solutions folder.
                           - it should include some sections:
@@ -118,8 +277,23 @@ class LeetCodeAgent:
             summary = self.ai_agent.get_conversation_summary()
             for key, value in summary.items():
                 self.logger.info(f"  {key}: {value}")
+        finally:
+            # Snapshot the cache so later runs reuse accepted solutions
+            _save_session()
+            # Only tear down the session this run opened; injected sessions
+            # belong to the caller and must survive the solve
+            if session_cm is not None:
+                await session_cm.__aexit__(*sys.exc_info())
+                self.browser_manager = None
+
+    def run(self, url=None) -> None:
+        """
+        Synchronous entry point for callers without an event loop.
 
-            await asyncio.sleep(20)
+        Args:
+            url (str, optional): URL to navigate to. Defaults to the daily problem.
+        """
+        asyncio.run(self.start_automation(url))
 
     async def navigate_to_daily_problem(self, page: Page) -> None:
         """
@@ -135,10 +309,7 @@ class LeetCodeAgent:
         # Navigate to problem page
         await page.goto("https://leetcode.com/problemset/")
 
-        # First, let's log the target element's HTML for debugging
-        daily_problem_link = "xpath=//a[contains(@class,'group flex flex-col rounded-[8px] duration-300 bg-fill-quaternary dark:bg-fill-quaternary')]"
-
-        await page.locator(daily_problem_link).first.click()
+        await page.locator(_DAILY_PROBLEM_LINK).first.click()
 
         await page.wait_for_load_state("networkidle")
 
@@ -155,25 +326,22 @@ class LeetCodeAgent:
 
         # Get current editor content
 
-        editor = page.locator(".view-lines").first
-        await editor.click()
-
-        # Save editor text to state
-        self.editor_text = await editor.inner_text()
+        self._ensure_locators(page)
+        await self._editor.click()
 
-        problemElement = page.locator(
-            "xpath=//div[contains(@class, 'flex w-full flex-1 flex-col gap-4 overflow-y-auto px-4 py-5')]"
+        # The two extractions are independent round-trips: overlap them
+        editor_text, problem_text = await asyncio.gather(
+            self._editor.inner_text(), self._problem.inner_text()
         )
 
-        problem_text = await problemElement.inner_text()
-
-        # Save problem text to state
+        # Save editor and problem text to state
+        self.editor_text = editor_text
         self.problem_text = problem_text
 
         # self.logger.info(f"📝 Problem text preview:\n{problem_text[:500]}...")
         return problem_text
 
-    async def grab_result(self, page: Page) -> boolean:
+    async def grab_result(self, page: Page) -> bool:
         """
         Check submission result and determine if the solution was accepted.
 
@@ -181,21 +349,88 @@ class LeetCodeAgent:
             page (Page): Playwright page instance.
 
         Returns:
-            boolean: True if solution was accepted, False otherwise.
+            bool: True if solution was accepted, False otherwise.
         """
-        await page.wait_for_timeout(10000)
-        result_area = "xpath=//*[@data-layout-path='/ts0/tb1']"
-        result_text = await page.locator(result_area).inner_text()
+        self._ensure_locators(page)
+        result_locator = self._result
+
+        # The submit hook already captured the judge's network verdict;
+        # only the failing-case details still come from the DOM
+        if self.last_verdict is not None:
+            if self.last_verdict.get("status_msg") == "Accepted":
+                self.logger.info("✅ Answer Accepted")
+                return True
 
-        if "Accepted" in result_text:
+            result_text = await result_locator.inner_text()
+            self._record_failure(result_text)
+            return False
+
+        # DOM fallback: wait for the verdict to actually render instead of
+        # a fixed delay; the judge usually answers in 1-3s
+        await result_locator.get_by_text(_VERDICT).first.wait_for(timeout=30000)
+
+        result_text = await result_locator.inner_text()
+
+        match = _VERDICT.search(result_text)
+        if match and match.group(0) == "Accepted":
             self.logger.info("✅ Answer Accepted")
             return True
 
-        self.wrong_case.append(result_text)
-        self.logger.info("❌ Answer not accepted")
+        self._record_failure(result_text)
         return False
 
-    def solve_problem(self, attempt: int) -> str:
+    def _record_failure(self, result_text: str) -> None:
+        """Store the verdict and the failing-case snippet for the retry."""
+        match = _VERDICT.search(result_text)
+        self.failure_verdict = match.group(0) if match else "Wrong Answer"
+
+        # Keep only the failing-case section; re-sending the full panel
+        # text just inflates the retry prompt
+        case = _CASE_START.search(result_text)
+        snippet = result_text[case.start() :] if case else result_text
+        self.wrong_case.append(snippet[:2000])
+        self.logger.info("❌ Answer not accepted")
+
+    def _ensure_locators(self, page: Page) -> None:
+        """Build and cache the page locators on first use."""
+        if self._editor is None:
+            self._editor = page.locator(".view-lines").first
+            self._problem = page.locator(_PROBLEM_PANEL)
+            self._result = page.locator(_RESULT_AREA)
+            self._submit = page.locator(_SUBMIT_BUTTON)
+
+    def _problem_key(self) -> str:
+        """Hash identifying the current (problem, template, language) combo."""
+        raw = f"{self.problem_text}{self.editor_text}{self.lang}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _initial_prompt(self) -> str:
+        """Build the first-solve prompt for the current problem."""
+        return f"""
+                Here is the problem description:
+                {self.problem_text}
+
+                and the template of the code is:
+                {self.editor_text}
+
+                Please analyze the language of the code and using the same language to solve the problem.
+                Return ONLY the code without any code block like ```java or ```python, and without any explanations or comments.
+                """
+
+    def _seed_conversation(self, solution: str) -> None:
+        """Prime the agent's history with the problem and a cached solution.
+
+        A cache hit skips the solve chat entirely, so without this the
+        follow-up prompts (markdown write-up, retries) would reach a model
+        that has never seen the problem or the code.
+        """
+        prompt = self._initial_prompt()
+        self.ai_agent.add_message("user", prompt)
+        self.ai_agent.add_message("assistant", solution)
+        if self.ai_agent.memory is not None:
+            self.ai_agent.memory.save_context({"input": prompt}, {"output": solution})
+
+    async def solve_problem(self, attempt: int) -> str:
         """
         Solve a specific LeetCode problem.
 
@@ -205,28 +440,44 @@ class LeetCodeAgent:
         Returns:
             str: The solution code generated by the AI agent.
         """
+
+        # Stream the solution as it decodes so progress is visible and the
+        # buffer fills while tokens arrive instead of after a silent wait
+        streamed = []
+
+        def on_token(text: str) -> None:
+            streamed.append(text)
+            self.logger.debug(f"✍️ streamed {sum(len(c) for c in streamed)} chars")
+
+        if attempt == 0:
+            # Cache hit: reuse the previously accepted solution without
+            # re-sending the problem statement to the LLM
+            cached = _SOLUTION_CACHE.get(self._problem_key())
+            if cached is not None:
+                self.logger.info("⚡ Reusing cached solution for this problem")
+                # Give the agent the context a real solve would have built,
+                # so any follow-up chat about this solution makes sense
+                self._seed_conversation(cached)
+                return cached
+
         if attempt > 0:
-            result = self.ai_agent.chat(
+            verdict = self.failure_verdict or "Wrong Answer"
+            hint = _VERDICT_HINTS.get(verdict, _DEFAULT_HINT)
+            result = await self.ai_agent.chat(
                 f"""
-                  the provided code did not work. Please fix it.
+                  the provided code did not work. The verdict was: {verdict}.
+                  {hint}
                   the wrong case is:
                   {self.wrong_case[-1]}
                   please try again.
                   Return ONLY the code without any code block like ```java or ```python, and without any explanations, or comments.
-              """
+              """,
+                on_token=on_token,
             )
         else:
-            result = self.ai_agent.chat(
-                f"""
-                Here is the problem description:
-                {self.problem_text}
-
-                and the template of the code is:
-                {self.editor_text}
-
-                Please analyze the language of the code and using the same language to solve the problem.
-                Return ONLY the code without any code block like ```java or ```python, and without any explanations or comments.
-                """
+            result = await self.ai_agent.chat(
+                self._initial_prompt(),
+                on_token=on_token,
             )
         return result
 
@@ -242,42 +493,62 @@ class LeetCodeAgent:
             autoSubmit (bool): Whether to automatically submit the answer after writing. Default is True.
         """
 
-        editor = page.locator(".view-lines").first
-        await editor.click()
-
-        # Code to paste
-        code = f"""{result_code}"""
-
-        # Use JSON.stringify for safer string handling
-        await page.evaluate(
-            f"""
-        async () => {{
-            const code = {repr(code)};
-            await navigator.clipboard.writeText(code);
-        }}
-        """
+        self._ensure_locators(page)
+        await self._editor.click()
+
+        # Set the Monaco model text directly: one evaluate call replaces the
+        # clipboard-write / select-all / delete / paste round-trips
+        wrote = await page.evaluate(
+            """(code) => {
+                if (window.monaco && monaco.editor.getModels().length > 0) {
+                    monaco.editor.getModels()[0].setValue(code);
+                    return true;
+                }
+                return false;
+            }""",
+            result_code,
         )
 
-        # Select all existing content
-        if self.is_mac:
-            select_all_key = "Meta+a"
-            paste_key = "Meta+v"
-        else:
-            select_all_key = "Control+a"
-            paste_key = "Control+v"
+        if not wrote:
+            # Fallback to the clipboard path when Monaco is not exposed.
+            # The code travels as an evaluate argument, so no escaping or
+            # re-parsing of the (potentially large) string is needed
+            await page.evaluate(
+                "code => navigator.clipboard.writeText(code)", result_code
+            )
 
-        await page.keyboard.press(select_all_key)
-        await page.keyboard.press("Delete")
+            # Select all existing content
+            await page.keyboard.press(_SELECT_ALL_KEY)
+            await page.keyboard.press("Delete")
 
-        # Paste the code
-        await page.keyboard.press(paste_key)
+            # Paste the code
+            await page.keyboard.press(_PASTE_KEY)
 
         self.logger.info("✅ Code pasted successfully")
 
         if autoSubmit:
-            await page.click("xpath=//button[@data-cid='3']")
+            await self._submit.click()
             self.logger.info("📤 Answer submitted.")
 
+            # Capture the judge verdict from the submission-check responses
+            # as it arrives, so no DOM polling is needed afterwards
+            self.last_verdict = None
+            try:
+                while True:
+                    response = await page.wait_for_response(
+                        lambda r: "submissions/detail" in r.url
+                        and "/check/" in r.url
+                        and r.status == 200,
+                        timeout=30000,
+                    )
+                    data = await response.json()
+                    if data.get("state") == "SUCCESS":
+                        self.last_verdict = data
+                        break
+            except Exception:
+                # Fall back to DOM-based verdict detection in grab_result
+                self.last_verdict = None
+
     def get_problem(self) -> Dict[str, Any]:
         """
         Get the current state of problem and editor content.
@@ -310,3 +581,43 @@ class LeetCodeAgent:
         if self.browser_manager:
             # The browser manager will handle its own cleanup
             pass
+
+        # Snapshot the session so later runs reuse cached solutions
+        _save_session()
+
+
+async def solve_problems(
+    urls, headless: bool = True, log_level: str = "INFO", lang: str = "java"
+) -> None:
+    """
+    Solve a batch of problems concurrently with worker coroutines.
+
+    Each worker pulls URLs from a shared queue and runs its own agent on a
+    separate browser context (the underlying browser is shared), so several
+    submissions can be in flight at once instead of waiting on each judge
+    verdict sequentially.
+
+    Args:
+        urls: Iterable of problem URLs to solve.
+        headless (bool): Whether to run the browsers in headless mode.
+        log_level (str): Logging level (DEBUG, INFO, WARNING, ERROR).
+        lang (str): Programming language for solving problems.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for url in urls:
+        queue.put_nowait(url)
+
+    async def worker() -> None:
+        while True:
+            try:
+                url = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            agent = LeetCodeAgent(headless=headless, log_level=log_level, lang=lang)
+            try:
+                await agent.start_automation(url)
+            finally:
+                queue.task_done()
+
+    worker_count = min(2, queue.qsize())
+    await asyncio.gather(*(worker() for _ in range(worker_count)))
@@ -12,7 +12,7 @@ import sys
 
 from leetcode_agent.core import LeetCodeAgent
 from leetcode_agent.utils import setup_logging
-from leetcode_agent.agent import AiAgent, ConversationTemplate
+from leetcode_agent.agent import AiAgent
 
 
 def create_parser():
@@ -126,8 +126,6 @@ async def interactive_mode():
     This function provides the interactive AI chat functionality
     without the full LeetCode automation workflow.
     """
-    import time
-
     print("🤖 LeetCode AI Agent - Interactive Mode")
     print("=" * 50)
     print("📝 You can paste LeetCode problems or ask for help")
@@ -140,7 +138,6 @@ async def interactive_mode():
             model_name="gemini-2.5-flash",
             temperature=0.5,
             api_key=os.getenv("GOOGLE_API_KEY"),
-            template=ConversationTemplate(),
         )
 
         print("✅ AI Agent initialized successfully!")
@@ -7,24 +7,86 @@ configuration management, and helper functions.
 
 import logging
 import os
+import re
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
 
-load_dotenv()
+# Whether the .env file has been loaded into the environment yet
+_ENV_LOADED = False
+
+
+def _ensure_env_loaded() -> None:
+    """Load the .env file on first use instead of at import time."""
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        load_dotenv()
+        _ENV_LOADED = True
+
+
+# Filename-sanitizing patterns, compiled once at import
+_SAFE_TITLE_COLLAPSE = re.compile(r'[\s_-]+')
+_ALREADY_SAFE = re.compile(r'\A[a-z0-9]+(?:_[a-z0-9]+)*\Z')
+
+
+class _StripTable(dict):
+    """Translate table that drops anything outside word/space/hyphen.
+
+    Verdicts are cached per code point, so str.translate deletes the
+    special characters in one C-level pass.
+    """
+
+    def __missing__(self, code):
+        char = chr(code)
+        verdict = code if (char.isalnum() or char.isspace() or char in '_-') else None
+        self[code] = verdict
+        return verdict
+
+
+_SAFE_TITLE_STRIP = _StripTable()
+
+# Matches leetcode.com, leetcode.cn and leetcode-cn.com in one C-level scan
+_LEETCODE_URL_RE = re.compile(r'leetcode(?:\.(?:com|cn)|-cn\.com)', re.IGNORECASE)
+
+# Loggers already configured by setup_logging, keyed by upper-cased level
+_LOGGER_CACHE: dict = {}
+
+# Supported level names resolved to logging constants up front
+_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+# One formatter shared by every console handler setup_logging creates
+_LOG_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
 
 
 def setup_logging(level: str = "INFO") -> logging.Logger:
     """
     Set up logging configuration for the application.
-    
+
+    Repeated calls with the same level return the already-configured
+    logger instead of tearing down and rebuilding its handlers.
+
     Args:
         level (str): Logging level (DEBUG, INFO, WARNING, ERROR)
-        
+
     Returns:
         Configured logger instance
     """
+    level_key = level.upper()
+    cached = _LOGGER_CACHE.get(level_key)
+    if cached is not None:
+        return cached
+
     # Convert string level to logging constant
-    numeric_level = getattr(logging, level.upper(), logging.INFO)
+    numeric_level = _LEVELS.get(level_key, logging.INFO)
     
     # Create logger
     logger = logging.getLogger("leetcode_agent")
@@ -38,30 +100,32 @@ def setup_logging(level: str = "INFO") -> logging.Logger:
     console_handler = logging.StreamHandler()
     console_handler.setLevel(numeric_level)
     
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_LOG_FORMATTER)
     
     # Add handler to logger
     logger.addHandler(console_handler)
-    
+
+    _LOGGER_CACHE[level_key] = logger
     return logger
 
 
+@lru_cache(maxsize=128)
 def get_config(key: str, default: Optional[str] = None) -> Optional[str]:
     """
     Get configuration value from environment variables.
-    
+
+    Results are cached, so repeated lookups of the same key are a dict hit
+    instead of an environment walk. Note that environment changes made
+    after the first lookup of a key are not observed.
+
     Args:
         key (str): Configuration key
         default (Optional[str]): Default value if key not found
-        
+
     Returns:
         Configuration value or default
     """
+    _ensure_env_loaded()
     return os.getenv(key, default)
 
 
@@ -75,27 +139,26 @@ def validate_url(url: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    valid_domains = [
-        "leetcode.com",
-        "leetcode.cn",
-        "leetcode-cn.com"
-    ]
-    
-    return any(domain in url.lower() for domain in valid_domains)
+    return _LEETCODE_URL_RE.search(url) is not None
+
+
+@lru_cache(maxsize=1)
+def _problems_url_prefix() -> str:
+    """Build the shared '<base>/problems/' prefix once."""
+    return get_config("LEETCODE_URL", "https://leetcode.com") + "/problems/"
 
 
 def format_problem_url(problem_slug: str) -> str:
     """
     Format a problem slug into a full LeetCode URL.
-    
+
     Args:
         problem_slug (str): Problem slug (e.g., "two-sum")
-        
+
     Returns:
         Full problem URL
     """
-    base_url = get_config("LEETCODE_URL", "https://leetcode.com")
-    return f"{base_url}/problems/{problem_slug}/"
+    return _problems_url_prefix() + problem_slug + "/"
 
 
 def safe_filename(title: str) -> str:
@@ -108,8 +171,11 @@ def safe_filename(title: str) -> str:
     Returns:
         Safe filename string
     """
+    # Titles that are already in safe form pass through untouched
+    if _ALREADY_SAFE.match(title):
+        return title
+
     # Remove special characters and replace spaces with underscores
-    import re
-    safe_title = re.sub(r'[^\w\s-]', '', title)
-    safe_title = re.sub(r'[\s_-]+', '_', safe_title)
+    safe_title = title.translate(_SAFE_TITLE_STRIP)
+    safe_title = _SAFE_TITLE_COLLAPSE.sub('_', safe_title)
     return safe_title.lower().strip('_')
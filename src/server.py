@@ -1,145 +1,156 @@
+import functools
+import inspect
+
 from mcp.server.fastmcp import FastMCP
 from leetcode_agent import *
 
 # Initialize the FastMCP server for Leetcode automation
 mcp = FastMCP("Leetcode MCP", "0.1.0")
 
-# Global variable to store the browser session (playwright, context, page)
-browser_manager = None
-
 # Message to return when no browser session is active
 no_browser_session_message = "No browser session found. Please open the browser and access leetcode.com for the user first."
 
 
-@mcp.tool(title="Open Browser and Access LeetCode")
-async def access_leetcode_web():
-    """
-    Launch a new Chrome browser and navigate to leetcode.com.
-    Sets some local storage items for the user session.
-    Returns a message indicating whether the user is logged in.
-    """
-    global browser_manager
-    browser_manager = await init_playwright(headless=False)
-    _, _, page = browser_manager
-    await page.goto("https://leetcode.com")
-    local_storage_items = {
-        "hasShownNewFeatureGuide": "true",
-        "global_lang": "java",
-    }
-
-    # Set local storage items for the session
-    for key, value in local_storage_items.items():
-        if value:
-            await page.evaluate(f"localStorage.setItem('{key}', '{value}')")
-
-    cookies = await page.context.cookies()
-    leetcode_session = next(
-        (c for c in cookies if c["name"] == "LEETCODE_SESSION"), None
-    )
-    if leetcode_session:
-        # User is logged in
-        return "Browser opened and user login already."
-    else:
-        # User is not logged in
-        return (
-            "User not logged in yet. Ask the user if they would like to login now, "
-            "and if yes, navigate to the login page."
-        )
-
-
-@mcp.tool(title="Navigate to URL")
-async def goto(url: str):
+def register_tools(mcp):
     """
-    Navigate the browser to a specified URL.
-
-    Args:
-        url (str): The URL to navigate to.
+    Register all LeetCode tools on the given FastMCP server.
 
-    Returns:
-        str: Status message after navigation.
+    The browser session lives in a dict captured by the tool closures, so
+    the per-call reads are cheap cell lookups instead of module-global
+    lookups and there is no session state left at module scope.
     """
-    global browser_manager
-    if not browser_manager:
-        return no_browser_session_message
-    _, _, page = browser_manager
-    await page.goto(url)
-    return f"Navigated to {url}"
-
-
-@mcp.tool(title="Go to Daily Problem Page")
-async def go_daily_problem():
-    """
-    Navigate the browser to the LeetCode daily problem page.
-    Returns a status message after navigation.
-    """
-
-    global browser_manager
-    if not browser_manager:
-        return no_browser_session_message
-    _, _, page = browser_manager
-    agent = LeetCodeAgent(
-        headless=False, log_level="INFO", lang="java", browser_manager=browser_manager
-    )
-    await agent.navigate_to_daily_problem(page)
-    return "Navigated to daily problem."
-
-
-@mcp.tool(title="Get Problem Description and analyze")
-async def get_problem() -> str:
-    """
-    Get the problem description from the current LeetCode problem page.
-    Returns a prompt for the user to decide whether to solve the problem.
-    """
-    global browser_manager
-    if not browser_manager:
-        return no_browser_session_message
-    _, _, page = browser_manager
-    agent = LeetCodeAgent(
-        headless=False, log_level="INFO", lang="java", browser_manager=browser_manager
-    )
-    problem_description = await agent.grabProblem(page)
-    return (
-        f"The problem description is: {problem_description}\n"
-        "Ask the user if they want me to solve it. "
-        "If yes, solve the problem and write the code in the code editor on the page, please use Java if User has not specified the language."
-    )
-
-
-@mcp.tool(title="Write Solution Code To Editor")
-async def write_code(code: str) -> str:
-    """
-    Write the solution code to the code editor on the page.
+    # Browser session components shared by the tool closures
+    state = {"playwright": None, "context": None, "page": None, "agent": None}
+
+    def require_browser(func):
+        """
+        Guard a tool behind an active browser session.
+
+        The wrapped coroutine receives the session page as its first
+        argument, so the per-tool session checks live in one place.
+        """
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            page = state["page"]
+            if page is None:
+                return no_browser_session_message
+            return await func(page, *args, **kwargs)
+
+        # Hide the injected page argument from the MCP tool schema
+        sig = inspect.signature(func)
+        wrapper.__signature__ = sig.replace(
+            parameters=[p for name, p in sig.parameters.items() if name != "page"]
+        )
+        return wrapper
+
+    @mcp.tool(title="Open Browser and Access LeetCode")
+    async def access_leetcode_web():
+        """
+        Launch a new Chrome browser and navigate to leetcode.com.
+        Sets some local storage items for the user session.
+        Returns a message indicating whether the user is logged in.
+        """
+        browser_manager = await init_playwright(headless=False)
+        state["playwright"], state["context"], state["page"] = browser_manager
+        state["agent"] = LeetCodeAgent(
+            headless=False, log_level="INFO", lang="java", browser_manager=browser_manager
+        )
+        page = state["page"]
+        await page.goto("https://leetcode.com")
+        local_storage_items = {
+            "hasShownNewFeatureGuide": "true",
+            "global_lang": "java",
+        }
+
+        # Set all local storage items in one round trip to the page
+        await page.evaluate(
+            "(items) => { for (const [key, value] of Object.entries(items)) { if (value) localStorage.setItem(key, value); } }",
+            local_storage_items,
+        )
 
-    Args:
-        code (str): The solution code to write. It should not contain any code block markdown syntax.
+        # Only leetcode.com cookies matter here, so filter at the browser side
+        cookies = await page.context.cookies(["https://leetcode.com"])
+        if any(c["name"] == "LEETCODE_SESSION" for c in cookies):
+            # User is logged in
+            return "Browser opened and user login already."
+        else:
+            # User is not logged in
+            return (
+                "User not logged in yet. Ask the user if they would like to login now, "
+                "and if yes, navigate to the login page."
+            )
+
+    @mcp.tool(title="Navigate to URL")
+    @require_browser
+    async def goto(page, url: str):
+        """
+        Navigate the browser to a specified URL.
+
+        Args:
+            url (str): The URL to navigate to.
+
+        Returns:
+            str: Status message after navigation.
+        """
+        await page.goto(url)
+        return f"Navigated to {url}"
+
+    @mcp.tool(title="Go to Daily Problem Page")
+    @require_browser
+    async def go_daily_problem(page):
+        """
+        Navigate the browser to the LeetCode daily problem page.
+        Returns a status message after navigation.
+        """
+
+        await state["agent"].navigate_to_daily_problem(page)
+        return "Navigated to daily problem."
+
+    @mcp.tool(title="Get Problem Description and analyze")
+    @require_browser
+    async def get_problem(page) -> str:
+        """
+        Get the problem description from the current LeetCode problem page.
+        Returns a prompt for the user to decide whether to solve the problem.
+        """
+        problem_description = await state["agent"].grabProblem(page)
+        return (
+            f"The problem description is: {problem_description}\n"
+            "Ask the user if they want me to solve it. "
+            "If yes, solve the problem and write the code in the code editor on the page, please use Java if User has not specified the language."
+        )
 
-    Returns:
-        str: Status message after writing the code.
-    """
-    global browser_manager
-    if not browser_manager:
-        return no_browser_session_message
-    _, _, page = browser_manager
-    agent = LeetCodeAgent(
-        headless=False, log_level="INFO", lang="java", browser_manager=browser_manager
-    )
-    await agent.writeAnswer(page, code, autoSubmit=False)
-    return "The solution code has been written to the code editor on the page. Please check it."
-
-
-@mcp.tool(title="Close Browser")
-async def close_browser():
-    """
-    Close the browser session and clean up resources.
-    Returns a status message after closing the browser.
-    """
-    global browser_manager
-    if not browser_manager:
-        return "Browser has already been closed."
-    playwright, context, page = browser_manager
-    await cleanup_playwright(playwright, context, page)
-    browser_manager = None
-    return "Browser closed."
+    @mcp.tool(title="Write Solution Code To Editor")
+    @require_browser
+    async def write_code(page, code: str) -> str:
+        """
+        Write the solution code to the code editor on the page.
+
+        Args:
+            code (str): The solution code to write. It should not contain any code block markdown syntax.
+
+        Returns:
+            str: Status message after writing the code.
+        """
+        await state["agent"].writeAnswer(page, code, autoSubmit=False)
+        return "The solution code has been written to the code editor on the page. Please check it."
+
+    @mcp.tool(title="Close Browser")
+    async def close_browser():
+        """
+        Close the browser session and clean up resources.
+        Returns a status message after closing the browser.
+        """
+        if state["page"] is None:
+            return "Browser has already been closed."
+        await cleanup_playwright(state["playwright"], state["context"], state["page"])
+        state["playwright"] = state["context"] = state["page"] = None
+        state["agent"] = None
+        return "Browser closed."
+
+
+register_tools(mcp)
 
 
 if __name__ == "__main__":